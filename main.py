@@ -20,15 +20,19 @@ if __name__ == "__main__":
     collector.await_handshake()
     collector.process_format_message()
 
-    # Use a fixed duration or wait for STOP-COM
+    # Use a fixed duration or wait for STOP-COM, streaming data to the recording folder
     try:
-        collector.read_sensor_data(duration=60, visualize=True)  # Record for 60 seconds
+        collector.read_sensor_data(duration=60, visualize=True, filename=fullpath)  # Record for 60 seconds
     except Exception as e:
         print(f"Error during data collection: {e}")
 
+    # Keep a columnar copy next to the CSV so later analysis can load it without parsing text
+    try:
+        collector.store_data(os.path.join(recording_path, "data.feather"))
+    except ImportError as e:
+        print(f"Skipping data.feather: {e}")
 
 
-    collector.store_data(fullpath)
     collector.close_connection()
 
 
@@ -1,5 +1,6 @@
 #define SAMPLE_RATE 200  // Sampling rate in Hz
 #define BUTTON_PIN 2    // Pin for the high/low button
+#define BINARY_FRAMES true // Send samples as binary frames instead of CSV text
 
 unsigned long previousMillis = 0;        // Store the previous loop time
 unsigned long interval = 1000 / SAMPLE_RATE; // Interval for sample rate in milliseconds
@@ -14,6 +15,7 @@ const unsigned long debounceDelay = 50; // Debounce delay in milliseconds
 int lastButtonState = HIGH; // Previous button state
 int buttonState; // Current button state
 int cntSerial = 0; // Tracks the current communication state
+uint16_t frameSeq = 0; // Sequence number of the next binary frame
 
 // Communication pins
 const int analogPins[] = {
@@ -26,6 +28,9 @@ const int analogPins[] = {
 };
 const int numAnalogPins = sizeof(analogPins) / sizeof(analogPins[0]);
 
+// Binary frame: magic (2), sequence number (2), Ts (4), readings (2 each), CRC-8 (1)
+const int frameSize = 9 + 2 * numAnalogPins;
+
 void setup() {
   // Initialise pins
   pinMode(LED_BUILTIN, OUTPUT);
@@ -55,6 +60,7 @@ void loop() {
       Serial.println("INIT-COM"); // Handshake
       listCommunicationPins();
       startingTime = millis();
+      frameSeq = 0;
     } else {
       // Stop communication
       Serial.println("STOP-COM");
@@ -117,6 +123,11 @@ void listCommunicationPins() {
 }
 
 void sendAnalogData() {
+  if (BINARY_FRAMES) {
+    sendAnalogFrame();
+    return;
+  }
+
   // Send data
   unsigned long Ts = millis() - startingTime;
   Serial.print(Ts);
@@ -127,3 +138,40 @@ void sendAnalogData() {
   }
   Serial.println();
 }
+
+// Send the readings as one binary frame, all values little-endian
+void sendAnalogFrame() {
+  uint8_t frame[frameSize];
+  int n = 0;
+  unsigned long Ts = millis() - startingTime;
+
+  frame[n++] = 0xAA; // Magic
+  frame[n++] = 0x55;
+  frame[n++] = frameSeq & 0xFF;
+  frame[n++] = frameSeq >> 8;
+  for (int b = 0; b < 4; b++) {
+    frame[n++] = (Ts >> (8 * b)) & 0xFF;
+  }
+  for (int i = 0; i < numAnalogPins; i++) {
+    int value = analogRead(analogPins[i]);
+    frame[n++] = value & 0xFF;
+    frame[n++] = (value >> 8) & 0xFF;
+  }
+  frame[n] = crc8(frame + 2, n - 2); // Everything after the magic
+  n++;
+
+  Serial.write(frame, n);
+  frameSeq++;
+}
+
+// CRC-8 with polynomial 0x07 and initial value 0
+uint8_t crc8(const uint8_t *data, int length) {
+  uint8_t crc = 0;
+  for (int i = 0; i < length; i++) {
+    crc ^= data[i];
+    for (int b = 0; b < 8; b++) {
+      crc = (crc & 0x80) ? (crc << 1) ^ 0x07 : crc << 1;
+    }
+  }
+  return crc;
+}
@@ -1,9 +1,135 @@
+import os
 import serial
 import serial.tools.list_ports
+import numpy as np
 import pandas as pd
+import threading
+from collections import deque
 import time
 import matplotlib.pyplot as plt
 
+try:
+    import numba
+except ImportError:  # Numba is optional, without it lines are parsed with np.fromstring
+    numba = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional, only needed to store Arrow IPC and Parquet files
+    pa = None
+
+FRAME_MAGIC = b"\xaa\x55"  # Start of a binary sample frame
+NUMBER_BYTES = b"0123456789.-,"  # The only bytes in a well-formed text data line
+
+
+def _make_crc8_table(polynomial=0x07):
+    """
+    Build the lookup table for the CRC-8 used by the binary sample frames.
+
+    Parameters:
+    - polynomial (int): The CRC-8 polynomial (default: 0x07, no reflection, initial value 0).
+
+    Returns:
+    - bytes: The CRC of every single byte value.
+    """
+    table = bytearray(256)
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ polynomial) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+        table[byte] = crc
+    return bytes(table)
+
+
+_CRC8_TABLE = np.frombuffer(_make_crc8_table(), dtype=np.uint8)
+
+
+def _valid_frames(frames):
+    """
+    Check the magic and CRC-8 of equally sized binary frames. The CRC is
+    computed for all frames at once, one table lookup per byte position,
+    instead of one Python loop per frame.
+
+    Parameters:
+    - frames (np.ndarray): Candidate frames as a (frames x frame size) uint8 array.
+
+    Returns:
+    - np.ndarray: True for every frame with a valid magic and CRC.
+    """
+    crc = np.zeros(len(frames), dtype=np.uint8)
+    for i in range(2, frames.shape[1] - 1):  # Everything between the magic and the CRC
+        crc = _CRC8_TABLE[crc ^ frames[:, i]]
+    return (frames[:, 0] == FRAME_MAGIC[0]) & (frames[:, 1] == FRAME_MAGIC[1]) & (crc == frames[:, -1])
+
+
+if numba is not None:
+    @numba.njit(cache=True, boundscheck=False)
+    def _parse_rows(buf, out):
+        """
+        Parse newline-separated rows of comma-separated decimal numbers into
+        out in a single pass over the raw bytes.
+
+        Parameters:
+        - buf (np.ndarray): The joined data lines as a uint8 array.
+        - out (np.ndarray): Output array (rows x columns), one row per line.
+
+        Returns:
+        - bool: False if a line is malformed or the row count does not match.
+        """
+        nrows, ncols = out.shape
+        row = 0
+        col = 0
+        value = 0.0
+        sign = 1.0
+        scale = 0.0  # Place value of the next fraction digit, 0 before the decimal point
+        digits = 0
+        ended = False  # Whitespace followed the value, only a comma or newline may come next
+        for i in range(len(buf) + 1):
+            c = buf[i] if i < len(buf) else 10  # Treat the end of the buffer as a final newline
+            if ended and (48 <= c <= 57 or c == 46 or c == 45):  # Whitespace inside a number
+                return False
+            if 48 <= c <= 57:  # Digit
+                if scale:
+                    value += (c - 48) * scale
+                    scale *= 0.1
+                else:
+                    value = value * 10 + (c - 48)
+                digits += 1
+            elif c == 46:  # Decimal point
+                if scale:
+                    return False
+                scale = 0.1
+            elif c == 45:  # Minus sign
+                if digits or scale or sign < 0:
+                    return False
+                sign = -1.0
+            elif c == 44 or c == 10:  # Comma or newline ends a value
+                if digits == 0 or row >= nrows:
+                    return False
+                out[row, col] = sign * value
+                value = 0.0
+                sign = 1.0
+                scale = 0.0
+                digits = 0
+                ended = False
+                if c == 44:
+                    col += 1
+                    if col >= ncols:
+                        return False
+                else:
+                    if col != ncols - 1:
+                        return False
+                    row += 1
+                    col = 0
+            elif c == 13 or c == 32:  # Carriage returns and spaces are allowed around a value
+                if digits or scale or sign < 0:
+                    ended = True
+            else:
+                return False
+        return row == nrows
+
+
 class ArduinoDataCollector:
     """
     A class to manage serial communication with an Arduino device for 
@@ -18,7 +144,7 @@ class ArduinoDataCollector:
         - port (str): The serial port to connect to.
         - baudrate (int): The baud rate for serial communication (default: 115200).
         - timeout (int): Timeout for the serial connection in seconds (default: 1).
-        - buffer_size (int): Maximum size of the buffer before flushing to DataFrame.
+        - buffer_size (int): Number of samples parsed and written to the CSV file per batch.
         """
         if port is None:
             ports = self.list_available_ports()
@@ -34,11 +160,23 @@ class ArduinoDataCollector:
         self.baudrate = baudrate
         self.timeout = timeout
         self.handshake_timeout = 100
+        self.read_timeout = 0.05  # Serial read timeout while recording, bounds the duration check delay
+        self.plot_rescale_interval = 1  # Seconds between full redraws of the live plot
         self.buffer_size = buffer_size
+        self.initial_capacity = 200 * 60  # One minute of samples at the Arduino's 200 Hz
         self.connection = None
-        self.data = None  # DataFrame will be initialized after receiving format message
-        self.buffer = []  # Buffer for temporarily storing data
-        self.columns = []  # Columns for the DataFrame
+        self.columns = []  # Column names from the format message, Ts first
+        # Sample arrays, allocated after receiving format message. The first column (Ts, milliseconds)
+        # is stored as uint32 like the Arduino's unsigned long, the 10-bit ADC readings as int16
+        self._ts = None
+        self._adc = None
+        self._n = 0  # Number of samples written to the sample arrays
+        self._frame_dtype = None  # Layout of a binary sample frame, defined by the format message
+        self._last_seq = None  # Sequence number of the last binary frame received
+        self._dropped_frames = 0  # Binary frames missing from the sequence numbers
+        self._rxbuf = bytearray()  # Received bytes not yet split into complete lines
+        self._stop_event = threading.Event()  # Signals the reader thread to stop recording
+        self._reader_error = None  # Exception raised in the reader thread, if any
 
     @staticmethod
     def list_available_ports():
@@ -73,6 +211,13 @@ class ArduinoDataCollector:
             print(f"Failed to connect: {e}")
             raise
 
+        # Lower the USB-serial latency timer where the driver supports it (Linux only)
+        try:
+            self.connection.set_low_latency_mode(True)
+            print("Enabled low latency mode")
+        except (AttributeError, NotImplementedError, OSError, ValueError) as e:
+            print(f"Low latency mode not available: {e}")
+
     def await_handshake(self):
         """
         Wait for a handshake signal ('INIT-COM') from the Arduino.
@@ -82,13 +227,13 @@ class ArduinoDataCollector:
         """
         start_time = time.time()
         while True:
-            if self.connection.in_waiting > 0:
-                message = self.connection.readline().decode('utf-8').strip()
-                if message.startswith("INIT-COM"):
-                    print("Handshake received from Arduino")
-                    self.connection.write(b"READY\n")  # Send acknowledgment
-                    print("Sent READY signal to Arduino")
-                    return
+            # _readline blocks until a line arrives or the connection timeout expires
+            message = self._readline().strip().decode('ascii', errors='ignore')
+            if message.startswith("INIT-COM"):
+                print("Handshake received from Arduino")
+                self.connection.write(b"READY\n")  # Send acknowledgment
+                print("Sent READY signal to Arduino")
+                return
             if time.time() - start_time > self.handshake_timeout:
                 print("Handshake timed out")
                 raise TimeoutError("Failed to receive handshake from Arduino")
@@ -96,18 +241,51 @@ class ArduinoDataCollector:
     def process_format_message(self):
         """
         Process the format message ('Format: ...') from the Arduino to define
-        the data structure for the DataFrame.
+        the data structure, the binary frame layout and allocate the sample
+        arrays.
         """
         while True:
-            if self.connection.in_waiting > 0:
-                format_message = self.connection.readline().decode('utf-8').strip()
-                if format_message.startswith("Format:"):
-                    print(f"Received format message: {format_message}")
-                    self.columns = format_message.replace("Format: ", "").split(",")
-                    self.data = pd.DataFrame(columns=self.columns)
-                    return
+            format_message = self._readline().strip().decode('ascii', errors='ignore')
+            if format_message.startswith("Format:"):
+                print(f"Received format message: {format_message}")
+                self.columns = format_message.replace("Format: ", "").split(",")
+                self._ts = np.empty(self.initial_capacity, dtype=np.uint32)
+                self._adc = np.empty((self.initial_capacity, len(self.columns) - 1), dtype=np.int16)
+                self._n = 0
+
+                # Binary frames: magic, sequence number, Ts and the ADC readings (little-endian), CRC-8
+                self._frame_dtype = np.dtype([("magic", "<u2"), ("seq", "<u2"), ("ts", "<u4"),
+                                              ("adc", "<i2", (len(self.columns) - 1,)), ("crc", "u1")])
+                self._last_seq = None
+                self._dropped_frames = 0
 
-    def read_sensor_data(self, duration=None, visualize=True):
+                if numba is not None:
+                    # Compile the parser now rather than on the first batch in the reader thread
+                    _parse_rows(np.frombuffer(b"0", dtype=np.uint8), np.empty((1, 1)))
+                return
+
+    def _readline(self):
+        """
+        Read one line from the Arduino through the receive buffer. Bytes are
+        read in bulk and searched for the newline in one call, instead of
+        pyserial's byte-by-byte readline. Bytes after the line stay buffered
+        for the next read.
+
+        Returns:
+        - bytes: The line including its newline, or b"" if no complete line
+                 arrived before the connection timeout expired.
+        """
+        end = self._rxbuf.find(b"\n")
+        if end < 0:
+            self._rxbuf += self.connection.read(max(1, self.connection.in_waiting))
+            end = self._rxbuf.find(b"\n")
+            if end < 0:
+                return b""
+        line = bytes(self._rxbuf[:end + 1])
+        del self._rxbuf[:end + 1]
+        return line
+
+    def read_sensor_data(self, duration=None, visualize=True, filename=None):
         """
         Read sensor data from the Arduino. The recording stops after the given
         duration or when a 'STOP-COM' signal is received.
@@ -116,99 +294,365 @@ class ArduinoDataCollector:
         - duration (int): Duration in seconds to record data (optional). 
                           If not provided, recording stops on 'STOP-COM'.
         - visualize (bool): Whether to display a live plot of the data.
+        - filename (str): CSV file to stream the samples to while recording (optional).
+                          Text lines are written as-is and binary frames as decimal
+                          values, in batches of buffer_size.
         """
 
         print(duration)
         start_time = time.time()
         sample_count = 0
+        csv_file = None
+        reader = None
+        lines = []  # Plot lines, still empty if the setup below fails
+        self.connection.timeout = self.read_timeout
+        self._stop_event.clear()
+        self._reader_error = None
         try:
+            if filename:
+                csv_file = open(filename, "wb", buffering=1 << 20)
+                csv_file.write(",".join(self.columns).encode("ascii") + b"\n")
+
             if visualize:
                 plt.ion()
                 fig, ax = plt.subplots()
-                lines = {}
-                for col in self.columns[1:]:  # Skip the first column (Ts)
-                    lines[col], = ax.plot([], [], label=col)
+                # One line per column, in column order, skipping the first column (Ts)
+                lines = [ax.plot([], [], label=col, animated=True)[0] for col in self.columns[1:]]  # Drawn by blitting only
                 ax.legend(loc="center left", bbox_to_anchor=(1, 0.5))  # Legend on the right
-                recent_data = {col: [] for col in self.columns[1:]}
+                ax.set_xlabel("Time (s)")
+                recent_rows = deque(maxlen=50)  # Last 50 plotted samples, without the Ts column
+                x_offsets = np.arange(-50, 0) * 0.25  # Plotted samples are 0.25 s apart
+                plt.show(block=False)
+                last_rescale = 0  # Forces a full draw and background snapshot on the first refresh
+
+            # Serial reads run in a background thread so plotting never delays them
+            reader = threading.Thread(target=self._reader_loop, args=(csv_file,), daemon=True)
+            reader.start()
 
-            while True:
+            while reader.is_alive():
                 # Stop if the fixed duration has elapsed
                 if duration and (time.time() - start_time) >= duration:
                     print(f"Recording stopped after {duration} seconds")
                     break
 
-                if self.connection.in_waiting > 0:
-                    raw_data = self.connection.readline().decode('utf-8').strip()
+                reader.join(0.05)
+                if not visualize:
+                    continue
 
-                    # Check for stop signal
-                    if raw_data == "STOP-COM":
-                        print("STOP-COM signal received. Stopping data collection.")
-                        break
+                # Visualize every 50th sample received since the last refresh
+                n = self._n  # Read the count before the array, the array may be grown in the meantime
+                rows = self._adc[sample_count:n]
+                first = (-sample_count - 1) % 50  # Index of the first 50th sample in rows
+                sample_count = n
+                if first < len(rows):
+                    elapsed_time = (sample_count // 50 * 50 / 200)  # Convert to seconds
+                    recent_rows.extend(rows[first::50].copy())
+                    recent = np.array(recent_rows)
+                    x = x_offsets[-len(recent):] + elapsed_time
+                    for i, line in enumerate(lines):
+                        line.set_data(x, recent[:, i])
 
-                    # Process sensor data
-                    parts = raw_data.split(",")
-                    if len(parts) == len(self.columns):  # Ensure correct data format
-                        # Create a dictionary with the received data
-                        row = {col: float(value) for col, value in zip(self.columns, parts)}
-                        self.buffer.append(row)
-
-                        # Visualize every 50th sample
-                        sample_count += 1
-                        if visualize and sample_count % 50 == 0:
-                            elapsed_time = (sample_count / 200)  # Convert to seconds
-                            for col in self.columns[1:]:  # Skip the first column (Ts)
-                                recent_data[col].append(row[col])
-                                if len(recent_data[col]) > 50:  # Limit the display to the last 50 samples
-                                    recent_data[col].pop(0)
-                            for col, line in lines.items():
-                                line.set_xdata([elapsed_time - (len(recent_data[col]) - i) * 0.25 for i in range(len(recent_data[col]))])
-                                line.set_ydata(recent_data[col])
-                            ax.relim()
-                            ax.autoscale_view()
-                            ax.set_xlabel("Time (s)")
-                            plt.draw()
-                            plt.pause(0.01)
-
-                        # Check if the buffer exceeds the size limit
-                        if len(self.buffer) >= self.buffer_size:
-                            self.flush_buffer_to_dataframe()
+                    # Rescale and redraw the full figure once per rescale interval, otherwise
+                    # restore the cached background and only redraw the lines (blitting)
+                    if time.time() - last_rescale >= self.plot_rescale_interval:
+                        ax.relim()
+                        ax.autoscale_view()
+                        fig.canvas.draw()
+                        background = fig.canvas.copy_from_bbox(ax.bbox)
+                        last_rescale = time.time()
+                    else:
+                        fig.canvas.restore_region(background)
+                    for line in lines:
+                        ax.draw_artist(line)
+                    fig.canvas.blit(ax.bbox)
+                fig.canvas.flush_events()
 
         except KeyboardInterrupt:
             print("Data collection stopped manually")
         finally:
-            # Ensure data in buffer is saved
-            self.flush_buffer_to_dataframe()
+            # Stop the reader, it saves its last partial batch before exiting
+            self._stop_event.set()
+            if reader:
+                reader.join()
+            if csv_file:
+                csv_file.close()
+                print(f"Data streamed to {filename}")
+            if self._dropped_frames:
+                print(f"Warning: {self._dropped_frames} binary frames were lost")
             if visualize:
+                # Let the final plot draw the lines normally
+                for line in lines:
+                    line.set_animated(False)
                 plt.ioff()
                 plt.show()
             self.close_connection()
 
-    def flush_buffer_to_dataframe(self):
+        if self._reader_error:
+            raise self._reader_error
+
+    def _reader_loop(self, csv_file=None):
+        """
+        Read and parse serial data into the sample arrays until the stop event
+        is set or a 'STOP-COM' signal is received. Runs in a background thread
+        started by read_sensor_data.
+
+        Parameters:
+        - csv_file (file): Binary file to stream the received lines to (optional).
+        """
+        self._raise_reader_priority()
+        batch = []  # Validated data lines, parsed and written once buffer_size lines are collected
+        frames = bytearray()  # Valid binary frames, decoded and written once buffer_size frames are collected
+
+        # Bind attributes used on every read to locals, avoiding repeated attribute lookups
+        connection = self.connection
+        read = connection.read
+        stopped = self._stop_event.is_set
+        stop = self._stop_event.set
+        split_frames = self._split_frames
+        store_lines = self._store_lines
+        store_frames = self._store_frames
+        add_line = batch.append
+        separators = len(self.columns) - 1  # Number of commas in a valid data line
+        buffer_size = self.buffer_size
+        frame_batch_size = buffer_size * self._frame_dtype.itemsize
+        rxbuf = self._rxbuf
+        try:
+            while not stopped():
+                # Block until data arrives or the read timeout expires, then read everything that is
+                # waiting and keep the trailing partial line or frame for the next read
+                rxbuf += read(max(1, connection.in_waiting))
+                received_frames, received_lines, rxbuf = split_frames(rxbuf)
+                frames += received_frames
+
+                for received_line in received_lines:
+                    received_line = received_line.rstrip(b"\r")
+
+                    # Check for stop signal
+                    if received_line == b"STOP-COM":
+                        print("STOP-COM signal received. Stopping data collection.")
+                        stop()
+                        break
+
+                    if received_line.count(b",") == separators:  # Ensure correct data format
+                        add_line(received_line)
+
+                # Process sensor data once a full batch is collected
+                if len(batch) >= buffer_size:
+                    store_lines(batch, csv_file)
+                    batch.clear()
+                if len(frames) >= frame_batch_size:
+                    store_frames(frames, csv_file)
+                    frames.clear()
+
+            # Ensure the last partial batch is saved
+            if batch:
+                store_lines(batch, csv_file)
+            if frames:
+                store_frames(frames, csv_file)
+        except Exception as e:
+            # Handed to the main thread, which re-raises it after cleaning up
+            self._reader_error = e
+        finally:
+            self._rxbuf = rxbuf
+
+    @staticmethod
+    def _raise_reader_priority():
+        """
+        Pin the calling (reader) thread to a single CPU and lower its nice
+        value, so the scheduler does not delay serial reads. Both are Linux
+        only and the nice value needs elevated permissions; where they are
+        not available the thread keeps its default scheduling.
+        """
+        try:
+            cpu = max(os.sched_getaffinity(0))  # Last usable CPU, CPU 0 usually handles most interrupts
+            os.sched_setaffinity(0, {cpu})  # 0 is the calling thread
+            print(f"Reader thread pinned to CPU {cpu}")
+        except (AttributeError, OSError) as e:
+            print(f"Could not pin reader thread to a CPU: {e}")
+        try:
+            os.nice(-5)
+            print("Reader thread priority raised")
+        except (AttributeError, OSError) as e:
+            print(f"Could not raise reader thread priority: {e}")
+
+    def _split_frames(self, rxbuf):
         """
-        Flush the buffer into the DataFrame. This method moves all data
-        from the buffer into the main DataFrame and clears the buffer.
+        Split received bytes into binary sample frames and text lines. Frames
+        start with FRAME_MAGIC and are only accepted when their CRC-8 matches.
+        Frames that follow each other back to back are validated together;
+        on an invalid frame the search resumes one byte later to resynchronise.
+
+        Parameters:
+        - rxbuf (bytearray): The received bytes.
+
+        Returns:
+        - tuple: The valid frames (concatenated bytes), the complete text lines
+                 (without newline) and the remaining bytes of an incomplete
+                 line or frame.
         """
-        if self.buffer:
-            buffer_df = pd.DataFrame(self.buffer)
-            if self.data is None or self.data.empty:
-                # If self.data is None or empty, directly assign buffer_df
-                self.data = buffer_df
+        frames, lines = bytearray(), []
+        size = self._frame_dtype.itemsize
+        pos = 0
+        while pos < len(rxbuf):
+            magic = rxbuf.find(FRAME_MAGIC, pos)
+            if magic < 0:
+                # Only text left
+                *text_lines, rest = rxbuf[pos:].split(b"\n")
+                lines.extend(text_lines)
+                return bytes(frames), lines, rest
+
+            # Complete text lines before the frame, a partial line right before it is noise
+            newline = rxbuf.rfind(b"\n", pos, magic)
+            if newline >= 0:
+                lines.extend(rxbuf[pos:newline].split(b"\n"))
+            pos = magic
+
+            count = (len(rxbuf) - pos) // size
+            if count == 0:
+                break  # Incomplete frame, wait for the rest
+            candidates = np.frombuffer(bytes(rxbuf[pos:pos + count * size]), dtype=np.uint8).reshape(count, size)
+            valid = _valid_frames(candidates)
+            run = count if valid.all() else int(valid.argmin())  # Leading run of valid frames
+            if run:
+                frames += rxbuf[pos:pos + run * size]
+                pos += run * size
             else:
-                # Concatenate only if self.data has existing data
-                self.data = pd.concat([self.data, buffer_df], ignore_index=True)
-            self.buffer = []  # Clear the buffer
+                pos += 1
+        return bytes(frames), lines, rxbuf[pos:]
+
+    def _store_frames(self, frames, csv_file=None):
+        """
+        Decode a batch of binary frames into the sample arrays with a single
+        np.frombuffer call and write their values to the CSV file.
+
+        Parameters:
+        - frames (bytearray): Valid binary frames, concatenated.
+        - csv_file (file): Binary file to stream the values to (optional).
+        """
+        samples = np.frombuffer(bytes(frames), dtype=self._frame_dtype)
+
+        # Count frames lost in transmission or dropped on a CRC mismatch (sequence numbers wrap at 2^16)
+        seq = samples["seq"].astype(np.int64)
+        if self._last_seq is not None:
+            seq = np.concatenate(([self._last_seq], seq))
+        self._dropped_frames += int(((np.diff(seq) - 1) % 65536).sum())
+        self._last_seq = int(seq[-1])
+
+        self._append_samples(samples["ts"], samples["adc"])
+        if csv_file:
+            np.savetxt(csv_file, np.column_stack((samples["ts"], samples["adc"])), fmt="%d", delimiter=",")
+
+    def _store_lines(self, data_lines, csv_file=None):
+        """
+        Parse a batch of data lines into the sample arrays and write the lines
+        that parsed to the CSV file.
+
+        Parameters:
+        - data_lines (list): Raw data lines (bytes) with the expected number of values.
+        - csv_file (file): Binary file to stream the lines to (optional).
+        """
+        rows, data_lines = self._parse_lines(data_lines)
+        self._append_samples(rows[:, 0], rows[:, 1:])
+        if csv_file and data_lines:
+            csv_file.write(b"\n".join(data_lines) + b"\n")
+
+    def _parse_lines(self, data_lines):
+        """
+        Parse complete data lines into a (samples x columns) array with a
+        single call to the compiled parser, or to np.fromstring when Numba is
+        not installed.
+
+        Parameters:
+        - data_lines (list): Raw data lines (bytes) with the expected number of values.
+
+        Returns:
+        - tuple: The parsed rows and the lines they were parsed from. Lines
+                 that cannot be parsed are dropped.
+        """
+        ncols = len(self.columns)
+        try:
+            if numba is not None:
+                # Compiled single-pass parser, falls through to line-by-line parsing when it fails
+                rows = np.empty((len(data_lines), ncols), dtype=np.float64)
+                if _parse_rows(np.frombuffer(b"\n".join(data_lines), dtype=np.uint8), rows):
+                    return rows, data_lines
+                raise ValueError("Malformed data line")
+            joined = b",".join(data_lines)
+            rows = np.fromstring(joined, sep=",", dtype=np.float64)
+            # Older NumPy (such as 2.2) only warns on unparsable data and returns the values read
+            # before it, so check for stray bytes and the value count before trusting the batch
+            if joined.translate(None, NUMBER_BYTES) or rows.size != len(data_lines) * ncols:
+                raise ValueError("Malformed data line")
+            return rows.reshape(-1, ncols), data_lines
+        except ValueError:
+            # Fall back to parsing line by line to drop only the malformed lines
+            parsed, kept = [], []
+            for line in data_lines:
+                try:
+                    # float() rejects empty, partial and trailing-garbage values that np.fromstring may accept
+                    row = [float(value) for value in line.split(b",")]
+                except ValueError:
+                    continue
+                if len(row) == ncols:
+                    parsed.append(row)
+                    kept.append(line)
+            return np.array(parsed, dtype=np.float64).reshape(-1, ncols), kept
+
+    def _append_samples(self, ts, adc):
+        """
+        Append samples to the sample arrays, doubling their size when full.
+
+        Parameters:
+        - ts (np.ndarray): Timestamps of the samples.
+        - adc (np.ndarray): ADC readings (samples x channels).
+        """
+        end = self._n + len(ts)
+        if end > len(self._ts):
+            capacity = len(self._ts)
+            while capacity < end:
+                capacity *= 2
+            self._adc = np.resize(self._adc, (capacity, len(self.columns) - 1))
+            self._ts = np.resize(self._ts, capacity)
+        self._ts[self._n:end] = ts
+        self._adc[self._n:end] = adc
+        self._n = end
+
+    def _column_arrays(self):
+        """
+        Return the recorded samples per column, in the order of self.columns.
+
+        Returns:
+        - list: One array per column, Ts (uint32) first followed by the ADC readings (int16).
+        """
+        return [self._ts[:self._n]] + [self._adc[:self._n, i] for i in range(len(self.columns) - 1)]
 
     def store_data(self, filename):
         """
-        Save the collected data to a CSV file.
+        Save the collected data to a file. The format follows the extension:
+        '.arrow' or '.feather' writes an Arrow IPC file, '.parquet' a Parquet
+        file (both require pyarrow), anything else a CSV file.
 
         Parameters:
-        - filename (str): The name of the CSV file to save the data to.
+        - filename (str): The name of the file to save the data to.
+
+        Raises:
+        - ImportError: If an Arrow or Parquet file is requested without pyarrow installed.
 
         Prints a message indicating success or if no data is available to save.
         """
-        if self.data is not None and not self.data.empty:
-            self.data.to_csv(filename, index=False)
+        if self._n > 0:
+            if filename.endswith((".arrow", ".feather", ".parquet")):
+                if pa is None:
+                    raise ImportError("pyarrow is required to store Arrow and Parquet files")
+                batch = pa.RecordBatch.from_arrays(
+                    [pa.array(values) for values in self._column_arrays()], names=self.columns)
+                if filename.endswith(".parquet"):
+                    pq.write_table(pa.Table.from_batches([batch]), filename)
+                else:
+                    with pa.ipc.new_file(filename, batch.schema) as writer:
+                        writer.write_batch(batch)
+            else:
+                pd.DataFrame(dict(zip(self.columns, self._column_arrays())), copy=False).to_csv(filename, index=False)
             print(f"Data saved to {filename}")
         else:
             print("No data to save.")
@@ -232,12 +676,10 @@ if __name__ == "__main__":
     collector.await_handshake()
     collector.process_format_message()
 
-    # Use a fixed duration or wait for STOP-COM
+    # Use a fixed duration or wait for STOP-COM, streaming data to file
     try:
-        collector.read_sensor_data(duration=60, visualize=True)  # Record for 60 seconds with live visualization
+        collector.read_sensor_data(duration=60, visualize=True, filename="sensor_data.csv")  # Record for 60 seconds with live visualization
     except Exception as e:
         print(f"Error during data collection: {e}")
 
-    # Store data to file
-    collector.store_data("sensor_data.csv")
     collector.close_connection()
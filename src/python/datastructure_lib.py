@@ -5,6 +5,21 @@ import json
 import numpy as np
 import pandas as pd
 import time  # Import time for timing the operations
+import logging
+
+try:
+    import orjson  # Faster JSON encoder with native NumPy support
+except ImportError:
+    orjson = None
+
+try:
+    import pyarrow as pa  # Reads the columnar data.feather copy of a recording
+    import pyarrow.csv as pa_csv  # Multithreaded CSV reader that parses only the requested columns
+except ImportError:
+    pa = None
+    pa_csv = None
+
+logger = logging.getLogger(__name__)
 
 def create_recording_structure():
     current_date = datetime.now().strftime('%Y/%m/%d')
@@ -12,89 +27,207 @@ def create_recording_structure():
     
     print('\nCreating datastructure:')
     
-    if not os.path.exists(base_dir):
+    # Create first and handle FileExistsError, so there is no separate exists check to race with
+    try:
         os.makedirs(base_dir)
         print(f"    Created folder: {base_dir}")
-    else:
+    except FileExistsError:
         print(f"    Folder already exists: {base_dir}")
 
-    recordings = [d for d in os.listdir(base_dir) if os.path.isdir(os.path.join(base_dir, d)) and d.startswith('recording_')]
-    
-    if recordings:
-        last_recording = sorted(recordings)[-1]
-        last_number = int(last_recording.split('_')[-1])
-    else:
-        last_number = 0
+    # DirEntry.is_dir() uses the directory listing itself, no stat call per entry
+    with os.scandir(base_dir) as entries:
+        recordings = [entry.name for entry in entries if entry.is_dir() and entry.name.startswith('recording_')]
 
-    next_number = last_number + 1
+    # Compare the numbers, not the names, so recording_1000 follows recording_999. Folders whose suffix
+    # is not a number (e.g. recording_001_old) are ignored.
+    suffixes = (name[len('recording_'):] for name in recordings)
+    next_number = max((int(suffix) for suffix in suffixes if suffix.isdecimal()), default=0) + 1
     recording_folder = os.path.join(base_dir, f"recording_{next_number:03d}")
 
-    if not os.path.exists(recording_folder):
-        os.makedirs(recording_folder)
+    try:
+        os.mkdir(recording_folder)
         print(f"    Created recording folder: {recording_folder}")
-    else:
+    except FileExistsError:
         print(f"    Recording folder already exists: {recording_folder}")
 
     log_file_path = os.path.join(recording_folder, 'log.json')
-    if not os.path.exists(log_file_path):
-        with open(log_file_path, 'w') as file:
+    try:
+        with open(log_file_path, 'x') as file:
             file.write('This is the log file for this recording.\n')
         print(f"        Created JSON file: {log_file_path}")
-    else:
+    except FileExistsError:
         print(f"        JSON file already exists: {log_file_path}")
     
     csv_file_path = os.path.join(recording_folder, 'data.csv')
-    if not os.path.exists(csv_file_path):
-        with open(csv_file_path, 'w') as file:
+    try:
+        with open(csv_file_path, 'x') as file:
             pass  # Creates an empty file
         print(f"        Created CSV file: {csv_file_path}")
-    else:
+    except FileExistsError:
         print(f"        CSV file already exists: {csv_file_path}")
 
     print('\n')
     return recording_folder
 
-def write_metafile(folder_path, ts):
-    start_time = time.time()
+# Largest number of distinct sampling intervals kept exactly, beyond it intervals are bucketed
+_MAX_EXACT_INTERVALS = 1 << 16
+# Relative accuracy of the bucketed intervals, and so of the median estimated from them
+_INTERVAL_RELATIVE_ACCURACY = 0.001
+
+def _merge_interval_counts(values, counts, intervals):
+    # Add sampling intervals to a sorted (value, count) histogram. Integer clock-tick timestamps
+    # give few distinct intervals, so the histogram stays small however long the recording is.
+    # Intervals already in the histogram are counted with one binary search over its few values,
+    # only intervals with a new value are sorted.
+    index = np.searchsorted(values, intervals)
+    known = index < len(values)
+    known[known] = values[index[known]] == intervals[known]
+    counts = counts + np.bincount(index[known], minlength=len(values))
+
+    new_values, new_counts = np.unique(intervals[~known], return_counts=True)
+    if len(new_values) > 0:
+        values = np.concatenate((values, new_values))
+        counts = np.concatenate((counts, new_counts))
+        order = np.argsort(values)
+        values, counts = values[order], counts[order]
+    return values, counts
+
+def _bucket_intervals(intervals):
+    # Replace every interval by the representative of its log-spaced bucket (as in DDSketch), which
+    # is within _INTERVAL_RELATIVE_ACCURACY of it. Zero and the sign are kept, so duplicates still count
+    # exactly, and any range of intervals fits in a few thousand buckets.
+    gamma = (1 + _INTERVAL_RELATIVE_ACCURACY) / (1 - _INTERVAL_RELATIVE_ACCURACY)
+    bucketed = np.zeros_like(intervals)
+    nonzero = intervals != 0
+    keys = np.ceil(np.log(np.abs(intervals[nonzero])) / np.log(gamma))
+    bucketed[nonzero] = np.copysign(2 * gamma ** keys / (gamma + 1), intervals[nonzero])
+    return bucketed
+
+def _merge_moments(count, mean, m2, values):
+    # Combine the count, mean and sum of squared deviations with those of a chunk of values (Chan et al.)
+    n = len(values)
+    chunk_mean = values.mean()
+    deviations = values - chunk_mean
+    total = count + n
+    delta = chunk_mean - mean
+    return total, mean + delta * n / total, m2 + np.dot(deviations, deviations) + delta ** 2 * count * n / total
+
+def _median_from_counts(values, counts, n):
+    # Median of the n intervals in the histogram, both middle ranks are found in one search
+    middle = np.searchsorted(np.cumsum(counts), [(n - 1) // 2, n // 2], side='right')
+    return values[middle].mean()
+
+def _read_time_chunks(folder_path, chunksize, block_size=8 << 20):
+    # Column names and an iterator over the 'time' column in float64 chunks. The memory-mapped
+    # data.feather needs no parsing and is preferred, data.csv is the fallback without pyarrow.
+    feather_file = os.path.join(folder_path, 'data.feather')
+    if pa is not None and os.path.exists(feather_file):
+        reader = pa.ipc.open_file(pa.memory_map(feather_file))
+        variables = reader.schema.names
+        if 'time' not in variables:
+            raise KeyError('time')
+        time_columns = (reader.get_batch(i).column('time') for i in range(reader.num_record_batches))
+        time_chunks = (column.slice(offset, chunksize).to_numpy().astype(np.float64)
+                       for column in time_columns for offset in range(0, len(column), chunksize))
+        return variables, time_chunks, 'Arrow file'
+
+    # Read the header, then only the time column in chunks so memory use does not grow with the file
+    csv_file = os.path.join(folder_path, 'data.csv')
+    with open(csv_file, 'rb') as file:
+        header_size = len(file.readline())
+    variables = pd.read_csv(csv_file, nrows=0).columns.tolist()
+    if 'time' not in variables:
+        raise KeyError('time')
+    if os.path.getsize(csv_file) <= header_size:
+        # Only a header, e.g. an aborted recording: there are no rows to parse
+        return variables, iter(()), 'empty CSV'
+    if pa_csv is not None:
+        # Skip rows with a wrong number of fields, such as the truncated last row of a crashed recording
+        reader = pa_csv.open_csv(csv_file,
+                                 read_options=pa_csv.ReadOptions(block_size=block_size, use_threads=True),
+                                 parse_options=pa_csv.ParseOptions(invalid_row_handler=lambda row: 'skip'),
+                                 convert_options=pa_csv.ConvertOptions(include_columns=['time'],
+                                                                       column_types={'time': pa.float64()}))
+        # Empty cells are nulls, which need a copy to become NaN as in the pandas reader
+        return variables, (batch.column(0).to_numpy(zero_copy_only=False) for batch in reader), 'CSV with pyarrow'
+    chunks = pd.read_csv(csv_file, usecols=['time'], dtype={'time': np.float64}, chunksize=chunksize, engine='c')
+    return variables, (chunk['time'].to_numpy() for chunk in chunks), 'CSV with pandas'
+
+def write_metafile(folder_path, ts, chunksize=1_000_000):
+    # Mean, std, min and max of the sampling intervals are exact. The median, and the missing points
+    # counted from it, are exact while there are at most _MAX_EXACT_INTERVALS distinct intervals, as with
+    # integer clock-tick timestamps. Beyond that they are estimated within _INTERVAL_RELATIVE_ACCURACY.
+    # Timings are only measured when debug logging is enabled
+    timing = logger.isEnabledFor(logging.DEBUG)
+    if timing:
+        start_time = time.time()
 
     ts_on_str = ts[0]
     ts_off_str = ts[1]
 
-    ts_on = datetime.strptime(ts_on_str, '%Y-%m-%d %H:%M:%S.%f')
-    ts_off = datetime.strptime(ts_off_str, '%Y-%m-%d %H:%M:%S.%f')
+    ts_on = datetime.fromisoformat(ts_on_str)
+    ts_off = datetime.fromisoformat(ts_off_str)
 
-    csv_file = os.path.join(folder_path, 'data.csv')
     log_file = os.path.join(folder_path, 'log.json')
     
-    # Timer: Start reading the CSV file with pandas
-    csv_read_start_time = time.time()
+    # Timer: Start reading the recorded data
+    if timing:
+        read_start_time = time.time()
 
     try:
-        # Read the CSV using pandas
-        df = pd.read_csv(csv_file)
-        variables = df.columns.tolist()
+        variables, time_chunks, source = _read_time_chunks(folder_path, chunksize)
+
+        data_points = 0
+        last_time = None
+        intervals_count, mean_interval, interval_m2 = 0, 0.0, 0.0
+        min_interval, max_interval = np.inf, -np.inf
+        interval_values = np.empty(0)
+        interval_counts = np.empty(0, dtype=np.int64)
+        bucketed = False
+        for time_values in time_chunks:
+            data_points += len(time_values)
+            if last_time is not None:
+                time_values = np.concatenate(([last_time], time_values))
+            if len(time_values) > 0:
+                last_time = time_values[-1]
+            intervals = np.diff(time_values)
+            if len(intervals) == 0:
+                continue
+
+            intervals_count, mean_interval, interval_m2 = _merge_moments(intervals_count, mean_interval, interval_m2, intervals)
+            min_interval = min(min_interval, intervals.min())
+            max_interval = max(max_interval, intervals.max())
 
-        # Timer: Finished reading the CSV file
-        print(f"Time to read CSV with pandas: {time.time() - csv_read_start_time:.6f} seconds")
+            if bucketed:
+                intervals = _bucket_intervals(intervals)
+            interval_values, interval_counts = _merge_interval_counts(interval_values, interval_counts, intervals)
+            if not bucketed and len(interval_values) > _MAX_EXACT_INTERVALS:
+                # Too many distinct intervals to keep exactly (e.g. non-integer timestamps)
+                bucketed = True
+                interval_values, inverse = np.unique(_bucket_intervals(interval_values), return_inverse=True)
+                interval_counts = np.bincount(inverse, weights=interval_counts).astype(np.int64)
 
-        # Timer: Start processing data
-        process_start_time = time.time()
+        # Timer: Finished reading the recorded data, start processing data
+        if timing:
+            logger.debug("Time to read %s in chunks: %.6f seconds", source, time.time() - read_start_time)
+            process_start_time = time.time()
 
-        time_list = df['time'].astype(float).tolist()
-        sampling_intervals = np.diff(time_list)
+        if intervals_count > 0:
+            median_interval = _median_from_counts(interval_values, interval_counts, intervals_count)
 
-        missing_points = int(sum(sampling_intervals > 1.5 * np.median(sampling_intervals)))
-        duplicated_points = int(sum(sampling_intervals <= 0))
+            missing_points = int(interval_counts[interval_values > 1.5 * median_interval].sum())
+            duplicated_points = int(interval_counts[interval_values <= 0].sum())
 
-        if len(sampling_intervals) > 0:
-            average_sampling_frequency = 1 / np.mean(sampling_intervals) * 1e6
+            average_sampling_frequency = 1 / mean_interval * 1e6
             sampling_stats = {
-                "mean": np.mean(sampling_intervals).item(),
-                "std_dev": np.std(sampling_intervals).item(),
-                "min": np.min(sampling_intervals).item(),
-                "max": np.max(sampling_intervals).item()
+                "mean": mean_interval,
+                "std_dev": np.sqrt(interval_m2 / intervals_count),
+                "min": min_interval,
+                "max": max_interval
             }
         else:
+            missing_points = 0
+            duplicated_points = 0
             average_sampling_frequency = 0
             sampling_stats = {
                 "mean": 0,
@@ -114,25 +247,30 @@ def write_metafile(folder_path, ts):
             "start_time": start_time_str,
             "stop_time": stop_time_str,
             "run_time_seconds": round(run_time, 2),
-            "data_points_count": int(len(df)),
-            "average_sampling_frequency_hz": average_sampling_frequency.item() if isinstance(average_sampling_frequency, np.generic) else average_sampling_frequency,
+            "data_points_count": data_points,
+            "average_sampling_frequency_hz": average_sampling_frequency,
             "sampling_stats_micros": sampling_stats,
             "missing_data_points": missing_points,
             "duplicated_data_points": duplicated_points
         }
 
-        # Timer: Finished processing data
-        print(f"Time to process data: {time.time() - process_start_time:.6f} seconds")
+        # Timer: Finished processing data, start writing to JSON
+        if timing:
+            logger.debug("Time to process data: %.6f seconds", time.time() - process_start_time)
+            json_write_start_time = time.time()
 
-        # Timer: Start writing to JSON
-        json_write_start_time = time.time()
-
-        with open(log_file, 'w') as json_file:
-            json.dump(metadata, json_file, indent=4)
+        if orjson is not None:
+            with open(log_file, 'wb') as json_file:
+                json_file.write(orjson.dumps(metadata, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+        else:
+            # The standard encoder needs NumPy scalars converted to Python numbers
+            with open(log_file, 'w') as json_file:
+                json.dump(metadata, json_file, indent=2, default=lambda value: value.item())
 
         # Timer: Finished writing to JSON
-        print(f"Time to write metadata to JSON: {time.time() - json_write_start_time:.6f} seconds")
-        print(f"Total time for write_metafile function: {time.time() - start_time:.6f} seconds")
+        if timing:
+            logger.debug("Time to write metadata to JSON: %.6f seconds", time.time() - json_write_start_time)
+            logger.debug("Total time for write_metafile function: %.6f seconds", time.time() - start_time)
 
     except KeyError as e:
         print(f"Key error: {e} - Make sure the 'count' and 'time' fields exist in the CSV header.")